@@ -1,7 +1,10 @@
 import asyncio
 import sys
-from bleak import BleakClient, BleakScanner
+from typing import Union
+from bleak import BleakScanner
+from bleak.backends.device import BLEDevice
 from bleak.exc import BleakError, BleakDeviceNotFoundError
+from bleak_retry_connector import BleakClientWithServiceCache, establish_connection
 
 # Replace with your Govee device's BLE MAC address (format like "A4:C1:38:xx:xx:xx")
 GOVEE_ADDRESS = "A4:C1:38:D3:81:44"
@@ -12,9 +15,17 @@ GOVEE_SERVICE_UUID = "00010203-0405-0607-0809-0a0b0c0d1910"
 # This is the characteristic used for control commands (write without response)
 GOVEE_CHAR_UUID = "00010203-0405-0607-0809-0a0b0c0d2b11"
 
-# Pre-built command arrays for ON and OFF
+# Upper bound in seconds for establishing a connection, including retries
+CONNECT_TIMEOUT = 30.0
+# Number of connection attempts before giving up
+CONNECT_ATTEMPTS = 3
+
+# Maximum time in seconds a single command write may take once connected
+WRITE_TIMEOUT = 3.0
+
+# Pre-built immutable command packets for ON and OFF
 # 20 bytes total, last byte is XOR of bytes 0..18
-CMD_ON = bytearray([
+CMD_ON = bytes([
     0x33, 0x01, 0x01, # 0x33 is header, 0x01 = power command, 3rd byte = ON
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 
@@ -22,7 +33,7 @@ CMD_ON = bytearray([
     0x33  # checksum = 0x33 ^ 0x01 ^ 0x01 = 0x33
 ])
 
-CMD_OFF = bytearray([
+CMD_OFF = bytes([
     0x33, 0x01, 0x00, # 0x33 is header, 0x01 = power command, 3rd byte = OFF
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 
@@ -41,12 +52,32 @@ async def scan_for_devices(timeout=5.0):
         list: Discovered BLE devices
     """
     print(f"Scanning for BLE devices (timeout: {timeout}s)...")
-    devices = await BleakScanner.discover(timeout=timeout)
+    found = {}
+
+    def on_detect(device, advertisement_data):
+        # Print each device as soon as it advertises instead of waiting
+        # for the whole scan window to finish
+        if device.address in found:
+            return
+        found[device.address] = device
+        name = device.name or "Unknown"
+        print(f"{len(found)}. {device.address} - {name}")
+
+    scanner = BleakScanner(detection_callback=on_detect)
+    await scanner.start()
+    try:
+        await asyncio.sleep(timeout)
+    finally:
+        await scanner.stop()
+
+    devices = list(found.values())
     
     if not devices:
         print("No BLE devices found.")
         return []
     
+    # Names often arrive in a later scan response, so list the devices again
+    # with their final names using the same numbering as the live rows
     print(f"Found {len(devices)} BLE devices:")
     for i, device in enumerate(devices, 1):
         name = device.name or "Unknown"
@@ -54,39 +85,244 @@ async def scan_for_devices(timeout=5.0):
     
     return devices
 
-async def toggle_govee_light(power_on: bool, address: str = None):
+class GoveeConnection:
+    """
+    Long-lived BLE connection to a single Govee device.
+
+    The client is connected lazily on the first command and kept open for
+    subsequent ones, so repeated commands only pay for the GATT write instead
+    of a full connect + service discovery + disconnect cycle.
+    """
+
+    def __init__(self, device: Union[str, BLEDevice], timeout: float = 10.0):
+        """
+        Args:
+            device (str | BLEDevice): Device address, or a BLEDevice from a
+                previous scan to skip looking the device up again on connect
+            timeout (float): Time in seconds to look up the device by address.
+                Connecting afterwards is bounded separately by
+                CONNECT_TIMEOUT, so the worst case for an address that has
+                not been scanned is timeout + CONNECT_TIMEOUT.
+        """
+        if isinstance(device, BLEDevice):
+            self.device = device
+            self.address = device.address
+        else:
+            self.device = None
+            self.address = device
+        self.timeout = timeout
+        self.client = None
+        # Serializes connects and writes so concurrent commands to the same
+        # device neither connect twice nor interleave
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_connected(self) -> bool:
+        return self.client is not None and self.client.is_connected
+
+    async def connect(self):
+        """
+        Connect to the device unless a live connection already exists.
+
+        Raises:
+            BleakDeviceNotFoundError: If the device could not be found
+            BleakError: If no connection could be made within CONNECT_TIMEOUT
+        """
+        if self.is_connected:
+            return
+        print(f"Connecting to {self.address}...")
+        if self.device is None:
+            self.device = await BleakScanner.find_device_by_address(self.address, timeout=self.timeout)
+            if self.device is None:
+                raise BleakDeviceNotFoundError(self.address)
+        # Retries transient connect failures with backoff and reuses the
+        # GATT services discovered on a previous connection. Discovery is
+        # limited to the Govee service since that is the only one we use.
+        # establish_connection allows up to 20 s per attempt on its own, so
+        # bound the attempts and the total time to keep the CLI responsive.
+        try:
+            self.client = await asyncio.wait_for(
+                establish_connection(
+                    BleakClientWithServiceCache,
+                    self.device,
+                    self.address,
+                    max_attempts=CONNECT_ATTEMPTS,
+                    services=[GOVEE_SERVICE_UUID],
+                ),
+                CONNECT_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            raise BleakError(f"Could not connect to {self.address} within {CONNECT_TIMEOUT}s")
+        print(f"Connected to {self.address}.")
+
+    async def send(self, command: bytes):
+        """
+        Write a command to the control characteristic, reconnecting once if
+        the cached connection has dropped.
+
+        Args:
+            command (bytes): 20-byte command packet
+
+        Raises:
+            asyncio.TimeoutError: If a write takes longer than WRITE_TIMEOUT
+        """
+        async with self._lock:
+            await self.connect()
+            try:
+                try:
+                    await self._write(command)
+                except BleakError:
+                    if self.is_connected:
+                        raise
+                    # Link dropped since the last command, reconnect and retry once
+                    await self.connect()
+                    await self._write(command)
+            except asyncio.TimeoutError:
+                # The timed out write was cancelled midway, leaving the link in
+                # an unknown state, so the next command has to reconnect
+                try:
+                    await self.close()
+                except BleakError:
+                    pass
+                raise
+
+    async def _write(self, command: bytes):
+        # Some Govee devices accept 'without response' only
+        await asyncio.wait_for(
+            self.client.write_gatt_char(GOVEE_CHAR_UUID, command, response=False),
+            WRITE_TIMEOUT,
+        )
+
+    async def close(self):
+        """
+        Disconnect from the device if connected.
+        """
+        # Forget the client first so it is never reused, even if the
+        # disconnect itself fails
+        client, self.client = self.client, None
+        if client is not None and client.is_connected:
+            await client.disconnect()
+
+# Open connections keyed by device address, shared by every command sent
+# during this run so each device is connected at most once
+_connections: dict[str, GoveeConnection] = {}
+
+def get_connection(device: Union[str, BLEDevice]) -> GoveeConnection:
+    """
+    Return the registered connection for a device, creating it if needed.
+
+    Args:
+        device (str | BLEDevice): Device address or scanned BLEDevice
+
+    Returns:
+        GoveeConnection: Connection for the device (not necessarily connected yet)
+    """
+    address = device.address if isinstance(device, BLEDevice) else device
+    connection = _connections.get(address)
+    if connection is None:
+        connection = _connections[address] = GoveeConnection(device)
+    elif connection.device is None and isinstance(device, BLEDevice):
+        connection.device = device
+    return connection
+
+async def close_all_connections():
     """
-    Connects to the Govee BLE device via BLE, sends the ON or OFF command,
-    then disconnects.
+    Disconnect every registered connection.
+    """
+    connections = list(_connections.values())
+    _connections.clear()
+    await asyncio.gather(*(connection.close() for connection in connections), return_exceptions=True)
+
+async def toggle_govee_light(power_on: bool, address: str = None, connection: GoveeConnection = None):
+    """
+    Sends the ON or OFF command to the Govee BLE device.
+
+    The connection is taken from the registry and left open for further
+    commands; call close_all_connections() when done.
+    
+    Never prompts the user, so it is safe to run for several devices at
+    once; a device that cannot be found is reported and then re-raised so
+    the caller can decide whether to offer a scan.
     
     Args:
         power_on (bool): True to turn on, False to turn off
         address (str, optional): Device address to connect to. Defaults to GOVEE_ADDRESS.
+        connection (GoveeConnection, optional): Connection to use instead of the registry
+
+    Raises:
+        BleakDeviceNotFoundError: If the device could not be found
     """
     command = CMD_ON if power_on else CMD_OFF
-    target_address = address or GOVEE_ADDRESS
+    if connection is None:
+        connection = get_connection(address or GOVEE_ADDRESS)
+    target_address = connection.address
     
     try:
-        # Create a BleakClient with the Govee address
-        print(f"Connecting to {target_address}...")
-        async with BleakClient(target_address, timeout=10.0) as client:
-            print(f"Connected to {target_address}. Sending command...")
-
-            # Write command to the control characteristic
-            # Some Govee devices accept 'without response' only
-            await client.write_gatt_char(GOVEE_CHAR_UUID, command, response=False)
-            print(f"Command sent! Device {'ON' if power_on else 'OFF'}")
+        await connection.send(command)
+        print(f"Command sent! Device {target_address} {'ON' if power_on else 'OFF'}")
             
     except BleakDeviceNotFoundError:
         print(f"Error: Device with address {target_address} was not found.")
-        print("Would you like to scan for available devices? (y/n)")
-        if input().lower() == 'y':
-            await scan_for_devices()
+        raise
+    except asyncio.TimeoutError:
+        print(f"Error: Device {target_address} did not accept the command within {WRITE_TIMEOUT}s.")
     except BleakError as e:
         print(f"Bluetooth error: {e}")
     except Exception as e:
         print(f"Unexpected error: {e}")
 
+async def toggle_govee_lights(power_on: bool, addresses: list):
+    """
+    Sends the ON or OFF command to several devices at once.
+
+    Each device has its own connection, so the connects and writes run
+    concurrently instead of one device after another. If any device could
+    not be found, a single offer to scan follows once all commands have
+    finished.
+
+    Args:
+        power_on (bool): True to turn on, False to turn off
+        addresses (list): Device addresses to control
+    """
+    results = await asyncio.gather(
+        *(toggle_govee_light(power_on, address) for address in addresses),
+        return_exceptions=True,
+    )
+
+    # Every other error is already reported by toggle_govee_light
+    missing = [
+        address for address, result in zip(addresses, results)
+        if isinstance(result, BleakDeviceNotFoundError)
+    ]
+    if missing:
+        print(f"Not found: {', '.join(missing)}")
+        print("Would you like to scan for available devices? (y/n)")
+        if input().lower() == 'y':
+            await scan_for_devices()
+
+async def control_device(device: Union[str, BLEDevice]):
+    """
+    Read on/off commands until the user quits, keeping the connection to the
+    device open in between.
+
+    Args:
+        device (str | BLEDevice): Device address or scanned BLEDevice to control
+    """
+    connection = get_connection(device)
+    while True:
+        print("Enter command (on/off/quit):")
+        cmd = input().lower()
+        if cmd in ["on", "off"]:
+            try:
+                await toggle_govee_light(cmd == "on", connection=connection)
+            except BleakDeviceNotFoundError:
+                # Already reported, keep accepting commands
+                pass
+        elif cmd in ["quit", "q"]:
+            return
+        else:
+            print("Invalid command. Use 'on', 'off' or 'quit'.")
+
 async def select_and_control_device():
     """
     Scan for devices, allow user to select one, and control it.
@@ -106,13 +342,8 @@ async def select_and_control_device():
                 selected_device = devices[choice-1]
                 print(f"Selected: {selected_device.address} - {selected_device.name or 'Unknown'}")
                 
-                print("Enter command (on/off):")
-                cmd = input().lower()
-                if cmd in ["on", "off"]:
-                    await toggle_govee_light(cmd == "on", selected_device.address)
-                    return
-                else:
-                    print("Invalid command. Use 'on' or 'off'.")
+                await control_device(selected_device)
+                return
             else:
                 print("Invalid selection.")
         except ValueError:
@@ -123,18 +354,22 @@ async def main():
     Main function to parse arguments and execute commands.
     """
     if len(sys.argv) < 2:
-        print("Usage: python govee_control.py [on/off/scan]")
+        print("Usage: python govee_control.py [on/off/scan] [ADDRESS ...]")
         return
     
     cmd = sys.argv[1].lower()
-    if cmd == "on":
-        await toggle_govee_light(True)
-    elif cmd == "off":
-        await toggle_govee_light(False)
-    elif cmd == "scan":
-        await select_and_control_device()
-    else:
-        print("Invalid argument. Use 'on', 'off', or 'scan'.")
+    addresses = sys.argv[2:] or [GOVEE_ADDRESS]
+    try:
+        if cmd == "on":
+            await toggle_govee_lights(True, addresses)
+        elif cmd == "off":
+            await toggle_govee_lights(False, addresses)
+        elif cmd == "scan":
+            await select_and_control_device()
+        else:
+            print("Invalid argument. Use 'on', 'off', or 'scan'.")
+    finally:
+        await close_all_connections()
 
 if __name__ == "__main__":
     asyncio.run(main())